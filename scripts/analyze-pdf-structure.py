@@ -2,12 +2,66 @@
 """
 PDFの構造を分析するスクリプト
 厚生局の歯科保険点数PDFの内容を理解するための初期分析
+
+使い方: python3 scripts/analyze-pdf-structure.py [--quick] [--pages N] [--seconds S]
+  --quick      層化サンプリングで一部のページだけ抽出し、推定統計と要確認箇所を出す
+  --pages N    クイックルックで抽出するページ数の上限（既定 20）
+  --seconds S  クイックルックの時間予算（秒, 既定 10）
 """
 
+import argparse
+import hashlib
+import math
+import os
+import random
+import time
+
 import pypdf
 import sys
 import json
 
+# ページごとの文字数キャッシュ（クイックルックと全件分析で共有）
+PAGE_CACHE_FILE = 'pdf_page_chars_cache.json'
+
+# 100文字未満を「短いページ」とみなす
+SHORT_PAGE_CHARS = 100
+
+# 95%信頼区間
+Z_95 = 1.96
+
+def file_hash(path):
+    """PDFファイルのSHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_page_cache(doc_hash):
+    """同じPDFの抽出済みページ文字数を読み込む（{ページ番号: 文字数}）"""
+    if not os.path.exists(PAGE_CACHE_FILE):
+        return {}
+    with open(PAGE_CACHE_FILE, encoding='utf-8') as f:
+        cache = json.load(f)
+    if cache.get('doc_hash') != doc_hash:
+        return {}
+    return {int(page): chars for page, chars in cache.get('page_chars', {}).items()}
+
+def save_page_cache(doc_hash, page_chars):
+    """抽出済みページ文字数を保存"""
+    with open(PAGE_CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({
+            'doc_hash': doc_hash,
+            'page_chars': {str(page): chars for page, chars in sorted(page_chars.items())}
+        }, f, ensure_ascii=False, indent=2)
+
+def page_char_count(reader, page_num, page_chars):
+    """ページの文字数（キャッシュになければ抽出して記録）"""
+    if page_num not in page_chars:
+        text = reader.pages[page_num - 1].extract_text()
+        page_chars[page_num] = len(text) if text else 0
+    return page_chars[page_num]
+
 def analyze_pdf(pdf_path):
     """PDFの基本情報と最初の数ページを分析"""
 
@@ -56,15 +110,22 @@ def analyze_pdf(pdf_path):
         print("ページ別文字数統計")
         print("=" * 80)
 
+        # クイックルックで抽出済みのページはキャッシュから再利用
+        doc_hash = file_hash(pdf_path)
+        page_chars = load_page_cache(doc_hash)
+        reused = len(page_chars)
+
         page_stats = []
-        for i, page in enumerate(reader.pages):
-            text = page.extract_text()
-            char_count = len(text) if text else 0
+        for i in range(len(reader.pages)):
             page_stats.append({
                 'page': i + 1,
-                'chars': char_count
+                'chars': page_char_count(reader, i + 1, page_chars)
             })
 
+        save_page_cache(doc_hash, page_chars)
+        if reused:
+            print(f"キャッシュ済みページを再利用: {reused}ページ")
+
         # 統計サマリー
         total_chars = sum(s['chars'] for s in page_stats)
         avg_chars = total_chars / len(page_stats) if page_stats else 0
@@ -75,7 +136,7 @@ def analyze_pdf(pdf_path):
         print(f"最小文字数: {min(s['chars'] for s in page_stats):,} (ページ {min(page_stats, key=lambda x: x['chars'])['page']})")
 
         # 空ページや短いページの検出
-        short_pages = [s for s in page_stats if s['chars'] < 100]
+        short_pages = [s for s in page_stats if s['chars'] < SHORT_PAGE_CHARS]
         if short_pages:
             print(f"\n文字数が少ないページ（100文字未満）: {len(short_pages)}ページ")
             for s in short_pages[:10]:  # 最初の10ページのみ表示
@@ -99,6 +160,174 @@ def analyze_pdf(pdf_path):
         print(f"エラー: {e}", file=sys.stderr)
         return None
 
+def wilson_interval(successes, n, fpc=1.0, z=Z_95):
+    """割合のWilsonスコア信頼区間（下限, 上限）
+
+    標本に該当ページが1つもなくても（すべて該当しても）区間の幅は0にならない。
+    有限母集団修正は有効標本サイズ n / fpc として反映する。
+    """
+    if n == 0:
+        return 0.0, 1.0
+    p = successes / n
+    if fpc <= 0:
+        return p, p
+    n_eff = n / fpc
+    denominator = 1 + z ** 2 / n_eff
+    center = (p + z ** 2 / (2 * n_eff)) / denominator
+    half_width = z * math.sqrt(p * (1 - p) / n_eff + z ** 2 / (4 * n_eff ** 2)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+def stratified_sample_order(total_pages, page_budget, seed=0):
+    """ページを均等な層に分け、各層から1ページずつ選ぶ
+
+    層は二分割を繰り返す順（先頭・末尾・中央…）に並べるので、
+    時間切れで途中終了しても文書全体に散らばったサンプルが残る。
+    """
+    strata_count = max(1, min(page_budget, total_pages))
+    rng = random.Random(seed)
+
+    strata = []
+    for k in range(strata_count):
+        start = k * total_pages // strata_count + 1
+        end = (k + 1) * total_pages // strata_count
+        strata.append({'start': start, 'end': end, 'page': rng.randint(start, end)})
+
+    order = [0, strata_count - 1] if strata_count > 1 else [0]
+    intervals = [(0, strata_count - 1)]
+    while intervals:
+        lo, hi = intervals.pop(0)
+        if hi - lo < 2:
+            continue
+        mid = (lo + hi) // 2
+        order.append(mid)
+        intervals.extend([(lo, mid), (mid, hi)])
+    order.extend(k for k in range(strata_count) if k not in order)
+
+    return [strata[k] for k in order]
+
+def analyze_pdf_quick(pdf_path, page_budget=20, time_budget=10.0):
+    """層化サンプリングによるクイックルック
+
+    全ページを抽出せずに、総文字数・平均・短いページの割合を信頼区間付きで推定し、
+    空白や極端に文字の少ない層を全件分析の候補として報告する。
+    抽出したページはキャッシュに残し、後の全件分析（analyze_pdf）で再利用する。
+    """
+
+    try:
+        reader = pypdf.PdfReader(pdf_path)
+        total_pages = len(reader.pages)
+
+        print("=" * 80)
+        print("クイックルック（層化サンプリング）")
+        print("=" * 80)
+        print(f"ページ数: {total_pages}")
+        print(f"予算: {page_budget}ページ / {time_budget:g}秒")
+
+        doc_hash = file_hash(pdf_path)
+        page_chars = load_page_cache(doc_hash)
+
+        # 予算内で層ごとにサンプルを抽出（キャッシュ済みページは予算を消費しない）
+        start_time = time.perf_counter()
+        strata = stratified_sample_order(total_pages, page_budget)
+        sampled = []
+        for stratum in strata:
+            if stratum['page'] not in page_chars and time.perf_counter() - start_time > time_budget:
+                break
+            stratum['chars'] = page_char_count(reader, stratum['page'], page_chars)
+            sampled.append(stratum)
+        elapsed = time.perf_counter() - start_time
+
+        save_page_cache(doc_hash, page_chars)
+
+        # 層の大きさで重み付けした推定（層ごと1サンプルなので分散は標本全体から近似）
+        n = len(sampled)
+        weights = [s['end'] - s['start'] + 1 for s in sampled]
+        covered = sum(weights)
+        values = [s['chars'] for s in sampled]
+        mean = sum(w * v for w, v in zip(weights, values)) / covered if covered else 0
+        fpc = 1 - n / total_pages if total_pages else 0
+
+        if n > 1:
+            variance = sum((v - mean) ** 2 for v in values) / (n - 1)
+            mean_margin = Z_95 * math.sqrt(variance / n * fpc)
+        else:
+            mean_margin = float('inf')
+
+        short_count = sum(1 for v in values if v < SHORT_PAGE_CHARS)
+        short_ratio = short_count / n if n else 0
+        short_low, short_high = wilson_interval(short_count, n, fpc)
+
+        # 空白・極端に文字数の少ない層は全件分析の対象として報告
+        suspicious = []
+        for s in sorted(sampled, key=lambda x: x['start']):
+            if s['chars'] < SHORT_PAGE_CHARS:
+                reason = '短いページ' if s['chars'] else '空白ページ（画像の可能性）'
+            elif s['chars'] < mean * 0.25:
+                reason = '平均より極端に少ない'
+            else:
+                continue
+            suspicious.append({'start': s['start'], 'end': s['end'], 'page': s['page'],
+                               'chars': s['chars'], 'reason': reason})
+
+        unsampled = [{'start': s['start'], 'end': s['end']} for s in strata[n:]]
+        blank_ratio = sum(1 for v in values if v == 0) / n if n else 1.0
+        is_text_based = n > 0 and blank_ratio < 0.5
+
+        print(f"\nサンプル: {n}ページ（{elapsed:.2f}秒）")
+        print(f"テキストベース: {'はい' if is_text_based else 'いいえ（スキャン画像の可能性）'}")
+        if n > 1:
+            print(f"推定平均文字数/ページ: {mean:.0f} ± {mean_margin:.0f}")
+            print(f"推定総文字数: {mean * total_pages:,.0f} ± {mean_margin * total_pages:,.0f}")
+        else:
+            # 1ページだけでは分散が求まらないので誤差幅は出さない
+            print(f"推定平均文字数/ページ: {mean:.0f}（誤差幅は推定不可）")
+            print(f"推定総文字数: {mean * total_pages:,.0f}（誤差幅は推定不可）")
+        if values:
+            print(f"サンプル中の最大文字数: {max(values):,} / 最小文字数: {min(values):,}")
+        print(f"短いページの割合: {short_ratio:.0%}（95%信頼区間 {short_low:.0%}〜{short_high:.0%}, "
+              f"推定 {math.floor(short_low * total_pages)}〜{math.ceil(short_high * total_pages)}ページ）")
+
+        if suspicious:
+            print(f"\n要確認の範囲（全件分析を推奨）: {len(suspicious)}箇所")
+            for s in suspicious[:10]:
+                print(f"  ページ {s['start']}-{s['end']}: {s['reason']}（ページ {s['page']}: {s['chars']}文字）")
+        if unsampled:
+            print(f"\n時間切れで未サンプルの層: {len(unsampled)}")
+
+        output_file = 'pdf_quicklook_stats.json'
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'total_pages': total_pages,
+                'sampled_pages': n,
+                'is_text_based': is_text_based,
+                'estimated_avg_chars_per_page': mean,
+                'avg_chars_margin_95': mean_margin if n > 1 else None,
+                'estimated_total_chars': mean * total_pages,
+                'short_page_ratio': short_ratio,
+                'short_page_ratio_lower_95': short_low,
+                'short_page_ratio_upper_95': short_high,
+                'sample_stats': [{'page': s['page'], 'chars': s['chars'], 'stratum': [s['start'], s['end']]}
+                                 for s in sorted(sampled, key=lambda x: x['page'])],
+                'suspicious_regions': suspicious,
+                'unsampled_regions': unsampled,
+            }, f, ensure_ascii=False, indent=2)
+
+        print(f"\n推定統計を {output_file} に保存しました")
+
+        return reader
+
+    except Exception as e:
+        print(f"エラー: {e}", file=sys.stderr)
+        return None
+
 if __name__ == "__main__":
     pdf_path = "厚生局　歯科保険点数.pdf"
-    analyze_pdf(pdf_path)
+    parser = argparse.ArgumentParser(description='PDFの構造を分析する')
+    parser.add_argument('--quick', action='store_true', help='層化サンプリングによるクイックルック')
+    parser.add_argument('--pages', type=int, default=20, help='クイックルックのページ予算')
+    parser.add_argument('--seconds', type=float, default=10.0, help='クイックルックの時間予算（秒）')
+    args = parser.parse_args()
+    if args.quick:
+        analyze_pdf_quick(pdf_path, page_budget=args.pages, time_budget=args.seconds)
+    else:
+        analyze_pdf(pdf_path)
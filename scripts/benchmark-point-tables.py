@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+点数表抽出のベンチマーク（ページ44-79）
+- 座標ベースの抽出（extract-point-tables.py）
+- 正規表現による抽出（extract_treatment_details_v2 と同じパターン）
+の処理時間と再現率を比較する
+
+再現率の基準は、ページのテキストで「番号 名称 点数点」の形で1行に収まっている
+点数行（ページ, 名称, 点数）とする。名称が折り返されて点数が次の行にある行は
+この基準に含まれないので、ページ59-66で目視確認した行を別の基準として再現率を出す。
+区分番号への帰属は別に集計する。
+"""
+
+import importlib.util
+import os
+import re
+import time
+import unicodedata
+from collections import defaultdict
+from typing import List, Set, Tuple
+
+import pypdf
+
+# extract_treatment_details_v2 のパターン（区分番号は全角数字を正規化した後の形で照合）
+REGEX_CODE_PATTERN = re.compile(r'([A-Z]\d{3}(?:-\d+)*)\s+([^\n]{5,50})')
+REGEX_SUB_PATTERN = re.compile(r'(\d)\s+([^\n]{5,80}?)\s+(\d{1,5})点')
+
+# 基準とする1行完結の点数行
+REFERENCE_LINE_PATTERN = re.compile(
+    r'^(?:(?:[A-Z]\d{3}(?:-\d+)*|\d{1,2}|[イロハニホヘトチリヌ])\s+|\(\d{1,2}\)\s*)'
+    r'(.+?)\s*(\d{1,3}(?:,\d{3})+|\d{1,5})点$'
+)
+
+# 名称が折り返されて1行に収まっていない点数行（ページ59-66を目視で確認）
+# テキストの出力順は全ページで表示順と一致しており、順序が入れ替わった行はなかった
+WRAPPED_REFERENCE_ROWS = [
+    (59, '筋肉、臓器に達するもの(長径5センチメートル以上10センチメートル未満)', 1680),
+    (59, '筋肉、臓器に達しないもの(長径5センチメートル以上10センチメートル未満)', 850),
+    (60, '筋肉、臓器に達するもの(長径2.5センチメートル以上5センチメートル未満)', 1400),
+    (60, '筋肉、臓器に達するもの(長径5センチメートル以上10センチメートル未満)', 2220),
+    (60, '筋肉、臓器に達しないもの(長径2.5センチメートル以上5センチメートル未満)', 500),
+    (60, '筋肉、臓器に達しないもの(長径5センチメートル以上10センチメートル未満)', 950),
+    (61, '長径3センチメートル以上6センチメートル未満の良性又は悪性皮膚腫瘍', 3230),
+    (66, '高線量率イリジウム照射を行った場合又は新型コバルト小線源治療装置を用いた場合', 12000),
+    (66, '高線量率イリジウム照射を行った場合又は新型コバルト小線源治療装置を用いた場合', 23000),
+]
+
+
+def load_script_module(filename: str, module_name: str):
+    """同じディレクトリのハイフン付きスクリプトをモジュールとして読み込む"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def normalize_page_text(page: pypdf.PageObject) -> str:
+    """全角英数を半角にし、区分番号中の全角ハイフンを揃える"""
+    text = unicodedata.normalize('NFKC', page.extract_text() or '')
+    return re.sub(r'(?<=\d)[－―‐ー](?=\d)', '-', text)
+
+
+def name_key(name: str) -> str:
+    """空白の有無で一致が揺れないように名称から空白を除く"""
+    return re.sub(r'\s+', '', name)
+
+
+def regex_point_rows(reader: pypdf.PdfReader, page_nums: List[int]) -> List[Tuple]:
+    """extract_treatment_details_v2 と同じ走査をNFKC正規化したテキストに対して行う"""
+    rows = []
+    for page_num in page_nums:
+        text = normalize_page_text(reader.pages[page_num - 1])
+        for match in REGEX_CODE_PATTERN.finditer(text):
+            start = max(0, match.start() - 100)
+            end = min(len(text), match.end() + 1000)
+            context = text[start:end]
+            for sub_match in REGEX_SUB_PATTERN.finditer(context):
+                rows.append((page_num, match.group(1), sub_match.group(2).strip(), int(sub_match.group(3))))
+    return rows
+
+
+def reference_rows(reader: pypdf.PdfReader, page_nums: List[int]) -> Set[Tuple]:
+    """1行に収まった点数行を（ページ, 名称, 点数）で集める"""
+    rows = set()
+    for page_num in page_nums:
+        for line in normalize_page_text(reader.pages[page_num - 1]).split('\n'):
+            match = REFERENCE_LINE_PATTERN.match(line.strip())
+            if match:
+                rows.add((page_num, name_key(match.group(1)), int(match.group(2).replace(',', ''))))
+    return rows
+
+
+def wrapped_reference(page_nums: List[int]) -> Set[Tuple]:
+    """目視確認した折り返し行のうち対象ページのもの"""
+    return {(page, name_key(name), points) for page, name, points in WRAPPED_REFERENCE_ROWS if page in page_nums}
+
+
+def report_method(label: str, elapsed: float, rows: List[Tuple], reference: Set[Tuple], wrapped: Set[Tuple]):
+    """（ページ, 区分番号, 名称, 点数）の行を基準（1行完結の行・折り返し行）と突き合わせて表示"""
+    found = {(page, name_key(name), points) for page, code, name, points in rows}
+    codes = defaultdict(set)
+    for page, code, name, points in rows:
+        codes[(page, name_key(name), points)].add(code)
+    ambiguous = sum(1 for key in found & reference if len(codes[key]) > 1)
+
+    print(f"\n[{label}] {elapsed:.2f}秒, {len(rows)}行")
+    if reference:
+        print(f"  再現率: {len(found & reference)}/{len(reference)} ({len(found & reference) / len(reference):.0%})")
+    if wrapped:
+        print(f"  再現率（折り返し行）: {len(found & wrapped)}/{len(wrapped)} "
+              f"({len(found & wrapped) / len(wrapped):.0%})")
+    print(f"  基準外の行: {len(found - reference - wrapped)}件")
+    print(f"  複数の区分番号に帰属した行: {ambiguous}件")
+
+
+def timed(func, *args):
+    """関数の実行時間（秒）と結果"""
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    pdf_path = "厚生局　歯科保険点数.pdf"
+    page_nums = list(range(44, 80))
+
+    tables = load_script_module('extract-point-tables.py', 'extract_point_tables')
+    rules = load_script_module('extract-detailed-rules.py', 'extract_detailed_rules')
+
+    print("=" * 80)
+    print(f"点数表抽出のベンチマーク（ページ {page_nums[0]}-{page_nums[-1]}）")
+    print("=" * 80)
+
+    # 各方式とも新しいReaderで計測（ページのパース結果のキャッシュを共有しない）
+    original_time, original = timed(rules.extract_treatment_details_v2, pypdf.PdfReader(pdf_path), page_nums)
+    regex_time, regex_rows = timed(regex_point_rows, pypdf.PdfReader(pdf_path), page_nums)
+    layout_time, layout_table = timed(tables.extract_point_tables, pypdf.PdfReader(pdf_path), page_nums)
+
+    reference = reference_rows(pypdf.PdfReader(pdf_path), page_nums)
+    wrapped = wrapped_reference(page_nums)
+    print(f"基準の点数行: {len(reference)}件（折り返し行 {len(wrapped)}件は別に集計）")
+
+    note = '（全角の区分番号に一致しない）' if not original else ''
+    print(f"\n[正規表現（extract_treatment_details_v2 そのまま）] {original_time:.2f}秒, "
+          f"診療行為 {len(original)}件{note}")
+    report_method('正規表現（NFKC正規化後）', regex_time, regex_rows, reference, wrapped)
+    report_method('座標ベース', layout_time, [
+        (row['page'], row['code'], row['name'], row['points']) for row in layout_table
+    ], reference, wrapped)
+
+
+if __name__ == "__main__":
+    main()
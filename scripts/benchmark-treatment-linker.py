@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+診療行為名リンカーのベンチマーク
+- PDFの点数表（link-treatment-names.py と同じページ範囲）の全項目をマスター全件とリンクする時間を計測
+- 同じ採点方法で全名称を総当たりした結果と比較し、インデックスによる候補の絞り込みで
+  最上位候補がどれだけ変わるか（絞り込みによる取りこぼし）を示す
+- 区分番号による加点なし（code=None）で、最上位候補の区分番号が点数表と一致する割合を示す
+"""
+
+import importlib.util
+import os
+import time
+from typing import Dict, List
+
+import pypdf
+
+
+def load_script_module(filename: str, module_name: str):
+    """同じディレクトリのハイフン付きスクリプトをモジュールとして読み込む"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+linker_module = load_script_module('link-treatment-names.py', 'link_treatment_names')
+
+# 総当たりは時間がかかるので、この間隔で間引いた項目だけを比較する
+BRUTE_FORCE_STEP = 5
+
+
+def schedule_items(records: List[Dict]) -> List[Dict]:
+    """診療行為レコードを照合単位（区分番号行・サブ項目行）の一覧に展開"""
+    items = []
+    for record in records:
+        items.append({'code': record['code'], 'query': record['name']})
+        for sub in record['sub_items']:
+            items.append({'code': record['code'], 'query': linker_module.sub_item_query(record, sub)})
+    return items
+
+
+def main():
+    pdf_path = "厚生局　歯科保険点数.pdf"
+    page_nums = linker_module.SCHEDULE_PAGES
+
+    print("=" * 80)
+    print("診療行為名リンカーのベンチマーク")
+    print("=" * 80)
+
+    reader = pypdf.PdfReader(pdf_path)
+    records = linker_module.collect_schedule_records(reader, page_nums)
+    items = schedule_items(records)
+    print(f"点数表の項目数: {len(items)}件 (ページ {page_nums[0]}-{page_nums[-1]})")
+
+    start = time.perf_counter()
+    entries = linker_module.load_master_entries(linker_module.MASTER_CSV_PATHS)
+    linker = linker_module.TreatmentNameLinker(entries)
+    build_time = time.perf_counter() - start
+    print(f"マスター読み込み+インデックス構築: {build_time:.2f}秒 ({len(linker.names)}名称)")
+
+    # n-gramインデックスによるリンク（全件）
+    start = time.perf_counter()
+    indexed_results = [linker.link(item['query'], item['code'], top_k=1) for item in items]
+    indexed_time = time.perf_counter() - start
+    print(f"\n[インデックス] 全{len(items)}件: {indexed_time:.2f}秒 "
+          f"({indexed_time / max(len(items), 1) * 1000:.1f}ms/件)")
+
+    # 区分番号の加点なしで、名称だけから正しい区分番号に辿り着けるか
+    unboosted = [linker.link(item['query'], None, top_k=1) for item in items]
+    section_hits = sum(
+        1 for item, result in zip(items, unboosted)
+        if result and result[0]['section_code'] == item['code']
+    )
+    print(f"  最上位候補の区分番号が一致（区分番号の加点なし）: {section_hits}/{len(items)} "
+          f"({section_hits / max(len(items), 1):.0%})")
+
+    # 総当たり（同じ採点方法で全名称を採点）
+    sample = list(range(0, len(items), BRUTE_FORCE_STEP))
+    start = time.perf_counter()
+    brute_results = [
+        linker.link(items[i]['query'], items[i]['code'], top_k=1, exhaustive=True) for i in sample
+    ]
+    brute_time = time.perf_counter() - start
+    per_item = brute_time / max(len(sample), 1)
+
+    differ = [
+        i for i, brute in zip(sample, brute_results)
+        if [r['code'] for r in brute] != [r['code'] for r in indexed_results[i]]
+    ]
+    print(f"\n[総当たり] {BRUTE_FORCE_STEP}件おきの{len(sample)}件: {brute_time:.2f}秒 "
+          f"({per_item * 1000:.1f}ms/件, 全件推定 {per_item * len(items):.1f}秒)")
+    print(f"  最上位候補が総当たりと異なる件数（絞り込みによる取りこぼし）: {len(differ)}/{len(sample)}")
+    for i in differ[:5]:
+        indexed = indexed_results[i][0]['name'] if indexed_results[i] else '(候補なし)'
+        brute = brute_results[sample.index(i)][0]['name']
+        print(f"    {items[i]['code']} {items[i]['query']}: インデックス={indexed} / 総当たり={brute}")
+
+    if indexed_time > 0:
+        print(f"\n高速化: 約{per_item * len(items) / indexed_time:.0f}倍")
+
+
+if __name__ == "__main__":
+    main()
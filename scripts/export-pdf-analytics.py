@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+PDF解析結果（JSON）を分析用の列指向テーブルに書き出すスクリプト
+- pdf_analysis_stats.json / pdf_treatment_extraction.json / pdf_detailed_rules.json を正規化
+- pages, sections, treatments, sub_items, conditions, addition_rules の6テーブル
+- 全行にドキュメントハッシュと改訂（revision）を持たせ、改訂ごとにファイルを追加していく
+- Arrow IPC（メモリマップでゼロコピー読み込み）または Parquet で保存
+
+使い方: python3 scripts/export-pdf-analytics.py [arrow|parquet] [revision]
+"""
+
+import hashlib
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+OUTPUT_DIR = 'pdf_analytics'
+
+# 100文字未満のページは analyze_pdf と同じく「短いページ」とみなす
+SHORT_PAGE_CHARS = 100
+
+KEY_FIELDS = [
+    ('doc_hash', pa.string()),
+    ('revision', pa.string()),
+]
+
+SCHEMAS = {
+    'pages': pa.schema(KEY_FIELDS + [
+        ('page', pa.int32()),
+        ('chars', pa.int32()),
+        ('is_short', pa.bool_()),
+        ('section', pa.string()),
+        ('is_important', pa.bool_()),
+        ('matched_keywords', pa.list_(pa.string())),
+        ('matched_rules', pa.list_(pa.string())),
+    ]),
+    'sections': pa.schema(KEY_FIELDS + [
+        ('section', pa.string()),
+        ('start_page', pa.int32()),
+        ('end_page', pa.int32()),
+        ('page_count', pa.int32()),
+    ]),
+    'treatments': pa.schema(KEY_FIELDS + [
+        ('treatment_id', pa.int32()),
+        ('source', pa.string()),
+        ('category', pa.string()),
+        ('code', pa.string()),
+        ('name', pa.string()),
+        ('page', pa.int32()),
+        ('points', pa.int32()),
+        ('context', pa.string()),
+    ]),
+    'sub_items': pa.schema(KEY_FIELDS + [
+        ('treatment_id', pa.int32()),
+        ('sub_item_id', pa.int32()),
+        ('code', pa.string()),
+        ('sub_number', pa.string()),
+        ('name', pa.string()),
+        ('points', pa.int32()),
+    ]),
+    'conditions': pa.schema(KEY_FIELDS + [
+        ('treatment_id', pa.int32()),
+        ('sub_item_id', pa.int32()),
+        ('position', pa.int32()),
+        ('condition', pa.string()),
+    ]),
+    'addition_rules': pa.schema(KEY_FIELDS + [
+        ('category', pa.string()),
+        ('rule_group', pa.string()),
+        ('type', pa.string()),
+        ('rate', pa.float64()),
+        ('description', pa.string()),
+    ]),
+}
+
+FILE_EXTENSIONS = {'arrow': '.arrow', 'parquet': '.parquet'}
+
+
+def load_json(path: str) -> Dict:
+    """JSONを読み込む（存在しなければ空）"""
+    if not os.path.exists(path):
+        print(f"見つかりません（スキップ）: {path}")
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def document_hash(pdf_path: str, fallback_paths: List[str]) -> str:
+    """元PDFのSHA-256（PDFがなければ解析JSONの内容から算出）"""
+    digest = hashlib.sha256()
+    paths = [pdf_path] if os.path.exists(pdf_path) else fallback_paths
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_tables(stats: Dict, extraction: Dict, rules: Dict) -> Dict[str, List[Dict]]:
+    """ネストしたJSONを正規化した行リストに変換"""
+    tables = {name: [] for name in SCHEMAS}
+
+    # セクション（ページ→セクションの対応も作っておく）
+    page_section: Dict[int, str] = {}
+    for section, info in extraction.get('section_map', {}).items():
+        tables['sections'].append({
+            'section': section,
+            'start_page': info['start'],
+            'end_page': info['end'],
+            'page_count': info['count'],
+        })
+        for page in info['pages']:
+            page_section.setdefault(page, section)
+
+    # ページ
+    important = {p['page']: p for p in extraction.get('important_pages', [])}
+    for stat in stats.get('page_stats', []):
+        page_info = important.get(stat['page'], {})
+        tables['pages'].append({
+            'page': stat['page'],
+            'chars': stat['chars'],
+            'is_short': stat['chars'] < SHORT_PAGE_CHARS,
+            'section': page_section.get(stat['page']),
+            'is_important': page_info.get('is_important', False),
+            'matched_keywords': page_info.get('matched_keywords', []),
+            'matched_rules': page_info.get('matched_rules', []),
+        })
+
+    # 診療行為・サブ項目・条件
+    def add_conditions(conditions: List[str], treatment_id: int, sub_item_id: Optional[int]):
+        for position, condition in enumerate(conditions):
+            tables['conditions'].append({
+                'treatment_id': treatment_id,
+                'sub_item_id': sub_item_id,
+                'position': position,
+                'condition': condition,
+            })
+
+    def add_treatment(treatment: Dict, source: str, category: Optional[str]):
+        treatment_id = len(tables['treatments'])
+        tables['treatments'].append({
+            'treatment_id': treatment_id,
+            'source': source,
+            'category': category,
+            'code': treatment['code'],
+            'name': treatment['name'],
+            'page': treatment.get('page'),
+            'points': treatment.get('points'),
+            'context': treatment.get('context') or treatment.get('context_preview'),
+        })
+        add_conditions(treatment.get('conditions', []), treatment_id, None)
+
+        for sub in treatment.get('sub_items', []):
+            sub_item_id = len(tables['sub_items'])
+            tables['sub_items'].append({
+                'treatment_id': treatment_id,
+                'sub_item_id': sub_item_id,
+                'code': treatment['code'],
+                'sub_number': sub['sub_number'],
+                'name': sub['name'],
+                'points': sub['points'],
+            })
+            add_conditions(sub.get('conditions', []), treatment_id, sub_item_id)
+
+    for treatment in extraction.get('extracted_treatments', []):
+        add_treatment(treatment, 'pdf_treatment_extraction', None)
+
+    for category, treatments in rules.get('treatments', {}).items():
+        for treatment in treatments:
+            add_treatment(treatment, 'pdf_detailed_rules', category)
+
+    # 加算ルール
+    for category, groups in rules.get('rules', {}).items():
+        for rule_group, items in groups.items():
+            for rule in items:
+                tables['addition_rules'].append({
+                    'category': category,
+                    'rule_group': rule_group,
+                    'type': rule['type'],
+                    'rate': rule['rate'],
+                    'description': rule['description'],
+                })
+
+    return tables
+
+
+def write_tables(tables: Dict[str, List[Dict]], doc_hash: str, revision: str,
+                 output_dir: str = OUTPUT_DIR, fmt: str = 'arrow') -> Dict[str, str]:
+    """テーブルごとのディレクトリに改訂単位のファイルを書き出す"""
+    written = {}
+
+    for name, rows in tables.items():
+        schema = SCHEMAS[name]
+        for row in rows:
+            row['doc_hash'] = doc_hash
+            row['revision'] = revision
+        table = pa.Table.from_pylist(rows, schema=schema)
+
+        table_dir = os.path.join(output_dir, name)
+        os.makedirs(table_dir, exist_ok=True)
+        path = os.path.join(table_dir, f"{revision}_{doc_hash[:12]}{FILE_EXTENSIONS[fmt]}")
+
+        if fmt == 'parquet':
+            pq.write_table(table, path)
+        else:
+            with pa.OSFile(path, 'wb') as sink:
+                with ipc.new_file(sink, schema) as writer:
+                    writer.write_table(table)
+
+        written[name] = path
+
+    return written
+
+
+def open_table(name: str, output_dir: str = OUTPUT_DIR, fmt: str = 'arrow') -> ds.Dataset:
+    """全改訂分のテーブルをデータセットとして開く（Arrow IPC はメモリマップで読まれる）"""
+    table_dir = os.path.join(output_dir, name)
+    paths = sorted(
+        os.path.join(table_dir, filename)
+        for filename in os.listdir(table_dir)
+        if filename.endswith(FILE_EXTENSIONS[fmt])
+    )
+    return ds.dataset(
+        paths,
+        format='ipc' if fmt == 'arrow' else 'parquet',
+        schema=SCHEMAS[name],
+        filesystem=pafs.LocalFileSystem(use_mmap=True),
+    )
+
+
+def read_arrow_file(path: str) -> pa.Table:
+    """単一のArrow IPCファイルをメモリマップでゼロコピー読み込み"""
+    with pa.memory_map(path, 'r') as source:
+        return ipc.open_file(source).read_all()
+
+
+def main():
+    pdf_path = "厚生局　歯科保険点数.pdf"
+    json_paths = ['pdf_analysis_stats.json', 'pdf_treatment_extraction.json', 'pdf_detailed_rules.json']
+
+    fmt = sys.argv[1] if len(sys.argv) > 1 else 'arrow'
+    if fmt not in FILE_EXTENSIONS:
+        print(f"エラー: 不明な形式 {fmt}（arrow または parquet）", file=sys.stderr)
+        sys.exit(1)
+
+    print("=" * 80)
+    print("解析結果を列指向テーブルに書き出し")
+    print("=" * 80)
+
+    stats, extraction, rules = (load_json(path) for path in json_paths)
+    revision = sys.argv[2] if len(sys.argv) > 2 else rules.get('extraction_date', 'unknown')
+    doc_hash = document_hash(pdf_path, json_paths)
+
+    print(f"ドキュメントハッシュ: {doc_hash[:12]}...")
+    print(f"改訂: {revision}")
+    print(f"形式: {fmt}")
+
+    tables = build_tables(stats, extraction, rules)
+    written = write_tables(tables, doc_hash, revision, OUTPUT_DIR, fmt)
+
+    print("\n書き出したテーブル:")
+    for name, path in written.items():
+        print(f"  {name}: {len(tables[name])}行 -> {path}")
+
+    print(f"\n{OUTPUT_DIR}/ 以下に保存しました")
+
+
+if __name__ == "__main__":
+    main()
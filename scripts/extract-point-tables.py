@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+座標ベースで点数表を抽出するスクリプト
+- pypdf のテキストビジターで文字片と座標を1ページ1パスで収集
+- ルビ（ふりがな）を文字サイズで除外し、y座標で行、x座標で列にまとめる
+- 区分番号列・サブ項目列の位置から (区分番号, サブ番号, 名称, 点数) の行を直接出力
+- 折り返されたサブ項目名は次の行と結合し、イ・ロ・(1)などの細目は「2-イ-(1)」の番号で出力する
+"""
+
+import json
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional
+
+import pypdf
+
+# 本文の文字高に対してこの割合未満の文字片はルビとみなす
+RUBY_HEIGHT_RATIO = 0.7
+
+# 同じ行とみなすy座標の差（文字高に対する割合）
+ROW_TOLERANCE_RATIO = 0.4
+
+# 同じ列とみなすx座標の差（pt）
+COLUMN_TOLERANCE = 3.0
+
+CODE_PATTERN = re.compile(r'^([A-Z]\d{3}(?:-\d+)*)\s+(.*)$')
+SUB_PATTERN = re.compile(r'^(\d{1,2})\s+(.*)$')
+BRANCH_PATTERN = re.compile(r'^([イロハニホヘトチリヌ]|\(\d{1,2}\))\s*(.*)$')
+POINTS_PATTERN = re.compile(r'^(.*?)\s*(\d{1,3}(?:,\d{3})+|\d{1,5})点$')
+
+
+def collect_fragments(page: pypdf.PageObject) -> List[Dict]:
+    """テキストビジターで文字片の座標と文字高を収集"""
+    fragments = []
+
+    def visitor(text, cm, tm, font_dict, font_size):
+        if not text or not text.strip():
+            return
+        matrix = pypdf.mult(tm, cm)
+        height = abs(matrix[3]) * font_size
+        # 1つの文字片に複数行が含まれる場合は行送りを文字高で近似
+        for offset, line in enumerate(text.split('\n')):
+            if line.strip():
+                fragments.append({
+                    'x': matrix[4],
+                    'y': matrix[5] - offset * height * 1.5,
+                    'height': height,
+                    'text': line,
+                })
+
+    page.extract_text(visitor_text=visitor)
+    return fragments
+
+
+def group_rows(fragments: List[Dict]) -> List[Dict]:
+    """文字片をy座標で行にまとめ、行内はx座標順に連結する"""
+    if not fragments:
+        return []
+
+    body_height = Counter(round(f['height'], 1) for f in fragments).most_common(1)[0][0]
+    body = [f for f in fragments if f['height'] >= body_height * RUBY_HEIGHT_RATIO]
+    tolerance = body_height * ROW_TOLERANCE_RATIO
+
+    rows = []
+    for fragment in sorted(body, key=lambda f: (-f['y'], f['x'])):
+        if rows and abs(rows[-1]['y'] - fragment['y']) <= tolerance:
+            rows[-1]['fragments'].append(fragment)
+        else:
+            rows.append({'y': fragment['y'], 'fragments': [fragment]})
+
+    for row in rows:
+        row['fragments'].sort(key=lambda f: f['x'])
+        row['x'] = row['fragments'][0]['x']
+        text = ' '.join(f['text'].strip() for f in row['fragments'])
+        row['text'] = unicodedata.normalize('NFKC', text).strip()
+
+    return rows
+
+
+def find_column(rows: List[Dict], predicate) -> Optional[float]:
+    """条件に合う行の先頭x座標で最も多いもの（列の位置）"""
+    positions = Counter(round(row['x']) for row in rows if predicate(row['text']))
+    return positions.most_common(1)[0][0] if positions else None
+
+
+def parse_points(text: str) -> int:
+    """「1,700」のような桁区切り付きの点数を整数にする"""
+    return int(text.replace(',', ''))
+
+
+def extract_point_table(page: pypdf.PageObject, page_num: int, state: Optional[Dict] = None) -> List[Dict]:
+    """1ページ分の点数表の行を抽出
+
+    state に直前ページの区分番号と見出しを渡すと、ページをまたいだ表を続けて読む。
+    """
+    if state is None:
+        state = {'code': None, 'headings': []}
+    rows = group_rows(collect_fragments(page))
+
+    code_x = find_column(rows, lambda t: CODE_PATTERN.match(t))
+
+    # サブ項目列は区分番号行の直後に来る番号付きの行の位置（なければ点数付きの番号行）
+    first_subs = [
+        row for prev, row in zip(rows, rows[1:])
+        if CODE_PATTERN.match(prev['text']) and SUB_PATTERN.match(row['text'])
+    ]
+    sub_x = (find_column(first_subs, lambda t: True)
+             or find_column(rows, lambda t: SUB_PATTERN.match(t) and POINTS_PATTERN.match(t)))
+
+    def in_column(row, x):
+        return x is not None and abs(row['x'] - x) <= COLUMN_TOLERANCE
+
+    table = []
+    current_code = state['code']
+    headings = state['headings']  # 点数を持たない見出しのサブ項目・細目（2 → 2-イ の親）
+    pending = None  # 点数がまだ見つかっていない（折り返された）サブ項目
+
+    for row in rows:
+        text = row['text']
+
+        # ページ番号で見出しが途切れないように読み飛ばす
+        if text.isdigit():
+            continue
+
+        code_match = CODE_PATTERN.match(text) if in_column(row, code_x) else None
+        if code_match:
+            current_code = code_match.group(1)
+            headings, pending = [], None
+            points_match = POINTS_PATTERN.match(code_match.group(2))
+            if points_match:
+                table.append({
+                    'page': page_num,
+                    'code': current_code,
+                    'sub_number': None,
+                    'name': points_match.group(1).strip(),
+                    'points': parse_points(points_match.group(2)),
+                })
+            continue
+
+        if in_column(row, sub_x):
+            # サブ項目列の「注」などは表の終わり
+            sub_match = SUB_PATTERN.match(text)
+            headings = []
+            if not sub_match:
+                pending = None
+                continue
+            pending = {'sub_number': sub_match.group(1), 'name': sub_match.group(2), 'level': 0}
+        elif sub_x is not None and row['x'] > sub_x + COLUMN_TOLERANCE:
+            branch_match = BRANCH_PATTERN.match(text)
+            if branch_match and headings:
+                # イ・ロは番号付きサブ項目の下、(1)・(2)はその下の細目
+                level = 2 if branch_match.group(1).startswith('(') else 1
+                parents = [h for h in headings if h['level'] < level]
+                if not parents:
+                    continue
+                headings = parents
+                pending = {
+                    'sub_number': f"{parents[-1]['sub_number']}-{branch_match.group(1)}",
+                    'name': branch_match.group(2),
+                    'level': level,
+                }
+            elif pending:
+                pending['name'] = f"{pending['name']}{text}"
+            else:
+                continue
+        else:
+            headings, pending = [], None
+            continue
+
+        points_match = POINTS_PATTERN.match(pending['name'])
+        if points_match:
+            # 最初の区分番号より前（範囲の先頭ページの続き）の行は帰属先がないので捨てる
+            if current_code:
+                table.append({
+                    'page': page_num,
+                    'code': current_code,
+                    'sub_number': pending['sub_number'],
+                    'name': points_match.group(1).strip(),
+                    'points': parse_points(points_match.group(2)),
+                })
+            pending = None
+        elif not headings or headings[-1] is not pending:
+            headings.append(pending)
+
+    state['code'] = current_code
+    state['headings'] = headings
+    return table
+
+
+def extract_point_tables(reader: pypdf.PdfReader, page_nums: List[int]) -> List[Dict]:
+    """指定ページの点数表の行をまとめて抽出"""
+    table = []
+    state = {'code': None, 'headings': []}
+    for page_num in page_nums:
+        table.extend(extract_point_table(reader.pages[page_num - 1], page_num, state))
+    return table
+
+
+def main():
+    pdf_path = "厚生局　歯科保険点数.pdf"
+    reader = pypdf.PdfReader(pdf_path)
+
+    print("=" * 80)
+    print("座標ベースの点数表抽出")
+    print("=" * 80)
+
+    page_nums = list(range(44, 80))
+    table = extract_point_tables(reader, page_nums)
+    codes = {row['code'] for row in table}
+    print(f"ページ {page_nums[0]}-{page_nums[-1]}: {len(table)}行, 区分番号 {len(codes)}件")
+
+    output_file = 'pdf_point_tables.json'
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'source': pdf_path,
+            'pages': page_nums,
+            'rows': table,
+            'summary': {
+                'total_rows': len(table),
+                'total_codes': len(codes),
+            }
+        }, f, ensure_ascii=False, indent=2)
+
+    print(f"\n詳細結果を {output_file} に保存しました")
+
+    print("\n抽出された行のサンプル:")
+    for row in table[:10]:
+        # 区分番号自体に枝番（I017-1-2）があるので、サブ番号は括弧で区別する
+        sub = f" [{row['sub_number']}]" if row['sub_number'] else ''
+        print(f"  {row['code']}{sub} {row['name']}: {row['points']}点")
+
+
+if __name__ == "__main__":
+    main()
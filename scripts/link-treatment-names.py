@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+PDFから抽出した診療行為名をマスターCSVの名称と突き合わせるスクリプト
+- マスター名称を正規化して文字n-gramの転置インデックスを構築
+- インデックスで候補を絞り込み、候補だけをスコアリング（総当たり比較をしない）
+- 点数表（extract_treatment_details_v2 と同じ形のレコード）の全項目に信頼度付きの候補一覧を付与
+"""
+
+import csv
+import difflib
+import json
+import os
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+# n-gramの長さ（日本語の診療行為名は2文字単位が最も安定する）
+NGRAM_SIZE = 2
+
+# スコアリング対象とする候補数の上限
+MAX_CANDIDATES = 50
+
+# 全マスターのこの割合を超えて出現するn-gramは候補探索に使わない
+COMMON_NGRAM_RATIO = 0.2
+
+# 正規化で取り除く記号
+STRIP_CHARS_PATTERN = re.compile(r'[\s（）()「」［］\[\]【】・、，,。．.：:／/－\-ー―‐]')
+
+# レコード識別ごとの名称カラム（先にあるものを優先して表示名にする）
+NAME_FIELDS = {
+    'H': (8, 9),  # 歯科診療行為マスター（h_*.csv）
+    'S': (4,),    # 医科診療行為マスター（k.csv）
+}
+
+MASTER_CSV_PATHS = ['h_20250901.csv', 'k.csv']
+
+# 点数表のページ範囲（第8部 処置〜第12部 歯冠修復）
+SCHEDULE_PAGES = list(range(42, 80))
+
+# 点数表の区分番号行・サブ項目行（NFKC正規化後の1行）
+SCHEDULE_CODE_PATTERN = re.compile(r'^([A-Z]\d{3}(?:-\d+)*)\s+(.+?)(?:\s+(\d{1,3}(?:,\d{3})+|\d{1,5})点)?$')
+SCHEDULE_SUB_PATTERN = re.compile(r'^(\d{1,2})\s+(.+?)\s+(\d{1,3}(?:,\d{3})+|\d{1,5})点$')
+
+
+def normalize_name(text: str) -> str:
+    """全角英数の半角化と記号・空白の除去を行う"""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFKC', text)
+    return STRIP_CHARS_PATTERN.sub('', text)
+
+
+def normalize_code(code: str) -> str:
+    """区分番号を比較用に正規化（例: Ｉ００５－２ → I005-2）"""
+    code = unicodedata.normalize('NFKC', code or '')
+    return re.sub(r'[－―‐ー]', '-', code).replace(' ', '')
+
+
+def ngrams(text: str, n: int = NGRAM_SIZE) -> set:
+    """正規化済み文字列の文字n-gram集合"""
+    if len(text) < n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def load_master_entries(csv_paths: List[str]) -> List[Dict]:
+    """マスターCSV（Shift-JIS）から名称とコードを読み込む"""
+    entries = []
+
+    for csv_path in csv_paths:
+        if not os.path.exists(csv_path):
+            print(f"マスターが見つかりません: {csv_path}")
+            continue
+
+        with open(csv_path, encoding='cp932', newline='') as f:
+            for fields in csv.reader(f):
+                if len(fields) < 5:
+                    continue
+
+                name_fields = NAME_FIELDS.get(fields[1])
+                if not name_fields:
+                    continue
+
+                names = []
+                for idx in name_fields:
+                    if idx < len(fields) and fields[idx] and fields[idx] not in names:
+                        names.append(fields[idx])
+                if not names:
+                    continue
+
+                # 歯科マスターは区分(I)と区分番号(005)から区分番号コード(I005)を復元できる
+                section_code = None
+                if fields[1] == 'H' and fields[3].isalpha() and fields[4].isdigit():
+                    section_code = f"{fields[3]}{fields[4]}"
+                    if fields[5] not in ('', '00'):
+                        section_code += f"-{int(fields[5])}"
+
+                entries.append({
+                    'code': fields[2],
+                    'name': names[0],
+                    'names': names,
+                    'section_code': section_code,
+                    'source': os.path.basename(csv_path),
+                })
+
+    return entries
+
+
+class TreatmentNameLinker:
+    """n-gram転置インデックスで候補を絞り込む名称リンカー"""
+
+    def __init__(self, entries: List[Dict], n: int = NGRAM_SIZE):
+        self.entries = entries
+        self.n = n
+        # 1エントリに複数名称があるため、名称単位でインデックスを張る
+        self.names: List[str] = []
+        self.name_grams: List[set] = []
+        self.name_owner: List[int] = []
+        self.index: Dict[str, List[int]] = defaultdict(list)
+
+        for entry_id, entry in enumerate(entries):
+            for name in entry['names']:
+                normalized = normalize_name(name)
+                if not normalized:
+                    continue
+                name_id = len(self.names)
+                grams = ngrams(normalized, n)
+                self.names.append(normalized)
+                self.name_grams.append(grams)
+                self.name_owner.append(entry_id)
+                for gram in grams:
+                    self.index[gram].append(name_id)
+
+        self.common_limit = max(1, int(len(self.names) * COMMON_NGRAM_RATIO))
+
+    def candidates(self, normalized: str, limit: int = MAX_CANDIDATES) -> List[int]:
+        """共有n-gram数の多い順に名称IDを返す"""
+        grams = ngrams(normalized, self.n)
+        postings = [self.index[g] for g in grams if g in self.index]
+
+        # ありふれたn-gram（「加算」など）は候補が爆発するので、他に手掛かりがあれば除外
+        selective = [p for p in postings if len(p) <= self.common_limit]
+        if selective:
+            postings = selective
+
+        overlap = defaultdict(int)
+        for posting in postings:
+            for name_id in posting:
+                overlap[name_id] += 1
+
+        return sorted(overlap, key=overlap.get, reverse=True)[:limit]
+
+    def score(self, normalized: str, query_grams: set, name_id: int, section_code: Optional[str]) -> float:
+        """n-gramのDice係数とSequenceMatcherの平均（区分番号が一致すれば加点、1.0を超えうる）"""
+        grams = self.name_grams[name_id]
+        dice = 2 * len(query_grams & grams) / (len(query_grams) + len(grams))
+        ratio = difflib.SequenceMatcher(None, normalized, self.names[name_id]).ratio()
+        score = (dice + ratio) / 2
+
+        entry_id = self.name_owner[name_id]
+        if section_code and self.entries[entry_id]['section_code'] == section_code:
+            score += 0.2
+        return score
+
+    def link(self, name: str, code: Optional[str] = None, top_k: int = 5,
+             exhaustive: bool = False) -> List[Dict]:
+        """名称（と区分番号）から信頼度順のマスター候補を返す
+
+        exhaustive=True ではインデックスを使わず全名称を同じ方法で採点する（検証用）。
+        """
+        normalized = normalize_name(name)
+        if not normalized:
+            return []
+
+        query_grams = ngrams(normalized, self.n)
+        section_code = normalize_code(code) if code else None
+        name_ids = range(len(self.names)) if exhaustive else self.candidates(normalized)
+
+        best: Dict[int, float] = {}
+        for name_id in name_ids:
+            score = self.score(normalized, query_grams, name_id, section_code)
+            entry_id = self.name_owner[name_id]
+            if score > best.get(entry_id, 0.0):
+                best[entry_id] = score
+
+        # 加点で1.0を超えた候補どうしも順位が付くように、信頼度の丸めは順位付けの後で行う
+        ranked = sorted(best.items(), key=lambda x: (-x[1], x[0]))[:top_k]
+        return [
+            {
+                'code': self.entries[entry_id]['code'],
+                'name': self.entries[entry_id]['name'],
+                'section_code': self.entries[entry_id]['section_code'],
+                'source': self.entries[entry_id]['source'],
+                'confidence': round(min(1.0, score), 3),
+            }
+            for entry_id, score in ranked
+        ]
+
+
+def collect_schedule_records(reader, page_nums: List[int]) -> List[Dict]:
+    """点数表の区分番号行とサブ項目行を extract_treatment_details_v2 と同じ形のレコードにまとめる
+
+    PDFの区分番号は全角（Ｉ００５）なので、行ごとにNFKC正規化してから照合する。
+    """
+    records = []
+
+    for page_num in page_nums:
+        text = reader.pages[page_num - 1].extract_text() or ''
+        current = None
+        for line in text.split('\n'):
+            line = unicodedata.normalize('NFKC', line).strip()
+            code_match = SCHEDULE_CODE_PATTERN.match(line)
+            if code_match:
+                current = {
+                    'code': code_match.group(1),
+                    'name': code_match.group(2),
+                    'page': page_num,
+                    'points': int(code_match.group(3).replace(',', '')) if code_match.group(3) else None,
+                    'sub_items': [],
+                }
+                records.append(current)
+                continue
+            sub_match = SCHEDULE_SUB_PATTERN.match(line)
+            if sub_match and current:
+                current['sub_items'].append({
+                    'sub_number': sub_match.group(1),
+                    'name': sub_match.group(2),
+                    'points': int(sub_match.group(3).replace(',', '')),
+                })
+
+    return records
+
+
+def sub_item_query(treatment: Dict, sub: Dict) -> str:
+    """サブ項目名だけでは曖昧（「単根管」など）なので親の名称と連結して照合する"""
+    return f"{treatment['name']}{sub['name']}"
+
+
+def link_treatments(linker: TreatmentNameLinker, treatments: List[Dict], top_k: int = 5) -> List[Dict]:
+    """診療行為レコード（extract_treatment_details_v2 と同じ形）とサブ項目にマスター候補を付与"""
+    linked = []
+
+    for treatment in treatments:
+        sub_links = []
+        for sub in treatment.get('sub_items', []):
+            sub_links.append({
+                'sub_number': sub['sub_number'],
+                'name': sub['name'],
+                'points': sub['points'],
+                'matches': linker.link(sub_item_query(treatment, sub), treatment['code'], top_k),
+            })
+
+        linked.append({
+            'code': treatment['code'],
+            'name': treatment['name'],
+            'page': treatment.get('page'),
+            'matches': linker.link(treatment['name'], treatment['code'], top_k),
+            'sub_items': sub_links,
+        })
+
+    return linked
+
+
+def main():
+    import pypdf
+
+    pdf_path = "厚生局　歯科保険点数.pdf"
+
+    print("=" * 80)
+    print("診療行為名とマスター名称のリンク")
+    print("=" * 80)
+
+    print("\n[ステップ1] マスターの読み込みとインデックス構築...")
+    entries = load_master_entries(MASTER_CSV_PATHS)
+    linker = TreatmentNameLinker(entries)
+    print(f"マスター件数: {len(entries)}件, 名称数: {len(linker.names)}, n-gram数: {len(linker.index)}")
+
+    print("\n[ステップ2] PDFの点数表から診療行為を抽出...")
+    reader = pypdf.PdfReader(pdf_path)
+    treatments = collect_schedule_records(reader, SCHEDULE_PAGES)
+    print(f"抽出された診療行為: {len(treatments)}件, "
+          f"サブ項目: {sum(len(t['sub_items']) for t in treatments)}件 "
+          f"(ページ {SCHEDULE_PAGES[0]}-{SCHEDULE_PAGES[-1]})")
+
+    print("\n[ステップ3] マスター候補の探索...")
+    linked = link_treatments(linker, treatments)
+
+    output_file = 'pdf_treatment_links.json'
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'source': pdf_path,
+            'pages': SCHEDULE_PAGES,
+            'masters': MASTER_CSV_PATHS,
+            'links': linked,
+            'summary': {
+                'total_treatments': len(linked),
+                'total_sub_items': sum(len(t['sub_items']) for t in linked),
+                'linked_treatments': sum(1 for t in linked if t['matches']),
+            }
+        }, f, ensure_ascii=False, indent=2)
+
+    print(f"\n詳細結果を {output_file} に保存しました")
+
+    for t in linked[:5]:
+        print(f"\n【{t['code']}】 {t['name']}")
+        for m in t['matches'][:3]:
+            print(f"  {m['code']} {m['name']} (信頼度 {m['confidence']})")
+
+
+if __name__ == "__main__":
+    main()